@@ -11,21 +11,16 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from __future__ import unicode_literals
-
 import collections
+import io
 import json
 import os
 import subprocess
 
 from refcycle.i_directed_graph import IDirectedGraph
 
-DOT_DIGRAPH_TEMPLATE = """\
-digraph G {{
-{edges}\
-{vertices}\
-}}
-"""
+DOT_DIGRAPH_HEADER = "digraph G {\n"
+DOT_DIGRAPH_FOOTER = "}\n"
 DOT_VERTEX_TEMPLATE = "    {vertex} [label={label}];\n"
 DOT_EDGE_TEMPLATE = "    {start} -> {stop};\n"
 DOT_LABELLED_EDGE_TEMPLATE = "    {start} -> {stop} [label={label}];\n"
@@ -158,10 +153,11 @@ class AnnotatedGraph(IDirectedGraph):
 
         """
         obj_map = {vertex.id: vertex for vertex in vertices}
+        out_edges = self._out_edges
         edges = [
             edge
             for vertex_id in obj_map
-            for edge in self._out_edges[vertex_id]
+            for edge in out_edges[vertex_id]
             if edge.head in obj_map
         ]
 
@@ -181,11 +177,11 @@ class AnnotatedGraph(IDirectedGraph):
 
         self._obj_map = {vertex.id: vertex for vertex in vertices}
 
-        self._out_edges = collections.defaultdict(list)
-        self._in_edges = collections.defaultdict(list)
+        self._out_edges = out_edges = collections.defaultdict(list)
+        self._in_edges = in_edges = collections.defaultdict(list)
         for edge in self._edges:
-            self._out_edges[edge.tail].append(edge)
-            self._in_edges[edge.head].append(edge)
+            out_edges[edge.tail].append(edge)
+            in_edges[edge.head].append(edge)
 
         return self
 
@@ -270,43 +266,47 @@ class AnnotatedGraph(IDirectedGraph):
     # Graphviz output
     ###########################################################################
 
-    def _format_edge(self, edge_labels, edge):
-        label = edge_labels.get(edge.id)
+    def _format_edge(self, edge):
+        label = edge.annotation
         if label is not None:
-            template = DOT_LABELLED_EDGE_TEMPLATE
-            return template.format(
+            return DOT_LABELLED_EDGE_TEMPLATE.format(
                 start=edge.tail,
                 stop=edge.head,
                 label=dot_quote(label),
             )
         else:
-            template = DOT_EDGE_TEMPLATE
-            return template.format(
+            return DOT_EDGE_TEMPLATE.format(
                 start=edge.tail,
                 stop=edge.head,
             )
 
-    def to_dot(self):
-        """
-        Produce a graph in DOT format.
+    def _format_vertex(self, vertex):
+        return DOT_VERTEX_TEMPLATE.format(
+            vertex=vertex.id,
+            label=dot_quote(vertex.annotation),
+        )
 
+    def write_dot(self, f):
         """
-        edge_labels = {edge.id: edge.annotation for edge in self._edges}
+        Write this graph in DOT format to the given text file object.
 
-        edges = [self._format_edge(edge_labels, edge) for edge in self._edges]
+        The output is written piece by piece, so the DOT representation of
+        the whole graph is never held in memory at once.
 
-        vertices = [
-            DOT_VERTEX_TEMPLATE.format(
-                vertex=vertex.id,
-                label=dot_quote(vertex.annotation),
-            )
-            for vertex in self.vertices
-        ]
+        """
+        f.write(DOT_DIGRAPH_HEADER)
+        f.writelines(map(self._format_edge, self._edges))
+        f.writelines(map(self._format_vertex, self._vertices))
+        f.write(DOT_DIGRAPH_FOOTER)
 
-        return DOT_DIGRAPH_TEMPLATE.format(
-            edges="".join(edges),
-            vertices="".join(vertices),
-        )
+    def to_dot(self):
+        """
+        Produce a graph in DOT format.
+
+        """
+        f = io.StringIO()
+        self.write_dot(f)
+        return f.getvalue()
 
     def export_image(self, filename="refcycle.png", format=None, dot_executable="dot"):
         """
@@ -335,14 +335,18 @@ class AnnotatedGraph(IDirectedGraph):
             else:
                 format = "png"
 
-        # Convert to 'dot' format.
-        dot_graph = self.to_dot()
-
-        # We'll send the graph directly to the process stdin.
+        # We'll write the graph in 'dot' format directly to the process stdin.
         cmd = [
             dot_executable,
             "-T{}".format(format),
             "-o{}".format(filename),
         ]
         dot = subprocess.Popen(cmd, stdin=subprocess.PIPE)
-        dot.communicate(dot_graph.encode("utf-8"))
+        try:
+            with io.TextIOWrapper(dot.stdin, encoding="utf-8") as dot_input:
+                self.write_dot(dot_input)
+        except BrokenPipeError:
+            # dot exited without reading all of its input; as with
+            # Popen.communicate, leave it to dot to report the problem.
+            pass
+        dot.wait()
@@ -159,49 +159,116 @@ def annotated_references(obj):
 BASE_TYPES = (int, float, complex, type(None), bytes, str)
 
 
+def base_annotation(obj):
+    return repr(obj)
+
+
+def function_annotation(obj):
+    return "function\\n{}".format(obj.__name__)
+
+
+def bound_method_annotation(obj):
+    try:
+        func_name = obj.__func__.__qualname__
+    except AttributeError:
+        func_name = "<anonymous>"
+    return "instancemethod\\n{}".format(func_name)
+
+
+def list_annotation(obj):
+    return "list[{}]".format(len(obj))
+
+
+def tuple_annotation(obj):
+    return "tuple[{}]".format(len(obj))
+
+
+def dict_annotation(obj):
+    return "dict[{}]".format(len(obj))
+
+
+def module_annotation(obj):
+    return "module\\n{}".format(obj.__name__)
+
+
+def type_annotation(obj):
+    return "type\\n{}".format(obj.__name__)
+
+
+def weakref_annotation(obj):
+    referent = obj()
+    if referent is None:
+        return "weakref (dead referent)"
+    else:
+        return "weakref to id 0x{:x}".format(id(referent))
+
+
+def frame_annotation(obj):
+    filename = obj.f_code.co_filename
+    if len(filename) > FRAME_FILENAME_LIMIT:
+        filename = "..." + filename[-(FRAME_FILENAME_LIMIT - 3) :]
+    return "frame\\n{}:{}".format(
+        filename,
+        obj.f_lineno,
+    )
+
+
+# Annotations for objects whose type is exactly one of the given types. This
+# lets the common cases be handled with a single dictionary lookup. Instances
+# of subclasses are handled by the isinstance checks in object_annotation.
+type_based_annotations = {
+    types.FunctionType: function_annotation,
+    types.MethodType: bound_method_annotation,
+    list: list_annotation,
+    tuple: tuple_annotation,
+    dict: dict_annotation,
+    types.ModuleType: module_annotation,
+    type: type_annotation,
+    weakref.ref: weakref_annotation,
+    types.FrameType: frame_annotation,
+}
+type_based_annotations.update(dict.fromkeys(BASE_TYPES, base_annotation))
+
+
 def object_annotation(obj):
     """
     Return a string to be used for Graphviz nodes.  The string
     should be short but as informative as possible.
 
     """
+    obj_type = type(obj)
+    try:
+        annotation = type_based_annotations.get(obj_type)
+    except TypeError:
+        # The type itself is unhashable; for example, its metaclass may
+        # define __eq__ without __hash__.
+        annotation = None
+    if annotation is not None:
+        return annotation(obj)
+
     # For basic types, use the repr.
     if isinstance(obj, BASE_TYPES):
-        return repr(obj)
-    if type(obj).__name__ == "function":
-        return "function\\n{}".format(obj.__name__)
+        return base_annotation(obj)
+    if obj_type.__name__ == "function":
+        return function_annotation(obj)
     elif isinstance(obj, types.MethodType):
-        try:
-            func_name = obj.__func__.__qualname__
-        except AttributeError:
-            func_name = "<anonymous>"
-        return "instancemethod\\n{}".format(func_name)
+        return bound_method_annotation(obj)
     elif isinstance(obj, list):
-        return "list[{}]".format(len(obj))
+        return list_annotation(obj)
     elif isinstance(obj, tuple):
-        return "tuple[{}]".format(len(obj))
+        return tuple_annotation(obj)
     elif isinstance(obj, dict):
-        return "dict[{}]".format(len(obj))
+        return dict_annotation(obj)
     elif isinstance(obj, types.ModuleType):
-        return "module\\n{}".format(obj.__name__)
+        return module_annotation(obj)
     elif isinstance(obj, type):
-        return "type\\n{}".format(obj.__name__)
+        return type_annotation(obj)
     elif isinstance(obj, weakref.ref):
-        referent = obj()
-        if referent is None:
-            return "weakref (dead referent)"
-        else:
-            return "weakref to id 0x{:x}".format(id(referent))
+        return weakref_annotation(obj)
     elif isinstance(obj, types.FrameType):
-        filename = obj.f_code.co_filename
-        if len(filename) > FRAME_FILENAME_LIMIT:
-            filename = "..." + filename[-(FRAME_FILENAME_LIMIT - 3) :]
-        return "frame\\n{}:{}".format(
-            filename,
-            obj.f_lineno,
-        )
+        return frame_annotation(obj)
     else:
         return "object\\n{}.{}".format(
-            type(obj).__module__,
-            type(obj).__name__,
+            obj_type.__module__,
+            obj_type.__name__,
         )
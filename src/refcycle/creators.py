@@ -112,11 +112,19 @@ def snapshot():
 
     """
     all_objects = gc.get_objects()
+
+    # Remove the frame of this function, if present. On CPython 3.11 and
+    # later the frame object is only created by inspect.currentframe(), after
+    # gc.get_objects() has run, so it's usually absent and this search only
+    # matters on older interpreters. The loop deliberately doesn't use a
+    # comprehension or other closure, whose cell would itself show up in
+    # later snapshots.
     this_frame = inspect.currentframe()
-    selected_objects = []
-    for obj in all_objects:
-        if obj is not this_frame:
-            selected_objects.append(obj)
-    graph = ObjectGraph(selected_objects)
-    del this_frame, all_objects, selected_objects, obj
+    for index, obj in enumerate(all_objects):
+        if obj is this_frame:
+            del all_objects[index]
+            break
+
+    graph = ObjectGraph(all_objects)
+    del this_frame, all_objects, obj
     return graph
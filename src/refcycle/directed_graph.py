@@ -27,10 +27,9 @@ between Python objects, both these capabilities are necessary.
 
 """
 import collections
-import itertools
 
 from refcycle.annotated_graph import AnnotatedEdge, AnnotatedGraph, AnnotatedVertex
-from refcycle.i_directed_graph import IDirectedGraph
+from refcycle.i_directed_graph import _csr_arrays, IDirectedGraph
 
 
 class DirectedGraph(IDirectedGraph):
@@ -38,16 +37,31 @@ class DirectedGraph(IDirectedGraph):
     Object representing a directed graph.
 
     `vertices` is a set of vertices
-    `edges` is a set of edges
+    `edges` is a collection of distinct edges
     `heads` is a mapping from edges to vertices mapping
        each edge to its head
     `tails` is a mapping from edges to vertices mapping
        each edge to its tail
 
-    `vertices` and `edges` may contain any hashable Python objects.
+    `vertices` and `edges` may contain any hashable Python objects.  Neither
+    is modified after construction, so `vertices` is usually a frozenset and
+    `edges` a frozenset or range.  When the edges are the consecutive
+    integers 0, 1, 2, ..., `heads` and `tails` may be lists indexed by edge.
 
     """
 
+    __slots__ = (
+        "_vertices",
+        "_edges",
+        "_heads",
+        "_tails",
+        "_out_edges",
+        "_in_edges",
+        "_children",
+        "_parents",
+        "__weakref__",
+    )
+
     ###########################################################################
     # IDirectedGraph interface
     ###########################################################################
@@ -80,6 +94,33 @@ class DirectedGraph(IDirectedGraph):
         """
         return self._in_edges[vertex]
 
+    def children(self, vertex):
+        """
+        Return the list of immediate children of the given vertex.
+
+        """
+        return list(self._children[vertex])
+
+    def parents(self, vertex):
+        """
+        Return the list of immediate parents of this vertex.
+
+        """
+        return list(self._parents[vertex])
+
+    def references(self):
+        """
+        Return (tail, head) pairs for each edge in the
+        graph.
+
+        """
+        heads, tails = self._heads, self._tails
+        if isinstance(heads, list) and self._edges == range(len(heads)):
+            # Edges 0, 1, 2, ... with heads and tails stored as lists (see the
+            # class docstring), so the pairs line up position by position.
+            return list(zip(tails, heads))
+        return [(tails[edge], heads[edge]) for edge in self._edges]
+
     @property
     def vertices(self):
         return self._vertices
@@ -95,22 +136,110 @@ class DirectedGraph(IDirectedGraph):
         of the original graph between those vertices.
 
         """
-        subgraph_vertices = {v for v in vertices}
-        subgraph_edges = {
-            edge
-            for v in subgraph_vertices
-            for edge in self._out_edges[v]
-            if self._heads[edge] in subgraph_vertices
-        }
-        subgraph_heads = {edge: self._heads[edge] for edge in subgraph_edges}
-        subgraph_tails = {edge: self._tails[edge] for edge in subgraph_edges}
+        subgraph_vertices = frozenset(vertices)
+        subgraph_heads = {}
+        subgraph_tails = {}
+
+        out_edges, heads = self._out_edges, self._heads
+        for tail in subgraph_vertices:
+            for edge in out_edges[tail]:
+                head = heads[edge]
+                if head in subgraph_vertices:
+                    subgraph_heads[edge] = head
+                    subgraph_tails[edge] = tail
         return DirectedGraph._raw(
             vertices=subgraph_vertices,
-            edges=subgraph_edges,
+            edges=frozenset(subgraph_heads),
             heads=subgraph_heads,
             tails=subgraph_tails,
         )
 
+    def descendants(self, start, generations=None):
+        """
+        Return the subgraph of all nodes reachable
+        from the given start vertex, including that vertex.
+
+        If specified, the optional `generations` argument specifies how
+        many generations to limit to.
+
+        """
+        return self._reachable_subgraph(
+            start, generations, self._out_edges, self._heads
+        )
+
+    def ancestors(self, start, generations=None):
+        """
+        Return the subgraph of all nodes from which the given vertex is
+        reachable, including that vertex.
+
+        If specified, the optional `generations` argument specifies how
+        many generations to limit to.
+
+        """
+        return self._reachable_subgraph(start, generations, self._in_edges, self._tails)
+
+    def _reachable_subgraph(self, start, generations, edge_map, far_ends):
+        """
+        Return the subgraph of vertices reachable from start by following
+        the edges given by edge_map, collecting the subgraph edges as part of
+        the same breadth-first search.
+
+        edge_map is one of self._out_edges and self._in_edges, and far_ends
+        is correspondingly self._heads or self._tails.
+
+        """
+        visited = {start}
+        subgraph_edges = []
+        # Breadth-first search, one generation at a time.
+        frontier = [start]
+        depth = 0
+        while frontier and depth != generations:
+            next_frontier = []
+            for vertex in frontier:
+                for edge in edge_map[vertex]:
+                    subgraph_edges.append(edge)
+                    far_end = far_ends[edge]
+                    if far_end not in visited:
+                        visited.add(far_end)
+                        next_frontier.append(far_end)
+            frontier = next_frontier
+            depth += 1
+
+        # Any vertices left in the frontier are at the generations limit and
+        # haven't been expanded; not all of their edges stay in the subgraph.
+        for vertex in frontier:
+            subgraph_edges.extend(
+                edge for edge in edge_map[vertex] if far_ends[edge] in visited
+            )
+
+        heads, tails = self._heads, self._tails
+        subgraph_heads = {edge: heads[edge] for edge in subgraph_edges}
+        return DirectedGraph._raw(
+            vertices=frozenset(visited),
+            edges=frozenset(subgraph_heads),
+            heads=subgraph_heads,
+            tails={edge: tails[edge] for edge in subgraph_edges},
+        )
+
+    def _csr(self):
+        """
+        Return the structure of the graph in compressed sparse row form.
+
+        See IDirectedGraph._csr. The child lists are read directly, rather
+        than copied through children().
+
+        """
+        vertices = list(self._vertices)
+        vertex_numbers = {vertex: i for i, vertex in enumerate(vertices)}
+
+        children = self._children
+
+        def child_numbers(vertex):
+            return [vertex_numbers[child] for child in children.get(vertex, ())]
+
+        offsets, targets = _csr_arrays(vertices, child_numbers)
+        return vertices, offsets, targets
+
     ###########################################################################
     # DirectedGraph constructors
     ###########################################################################
@@ -128,15 +257,53 @@ class DirectedGraph(IDirectedGraph):
         self._heads = heads
         self._tails = tails
 
-        # For future use, map each vertex to its outward and inward edges.
-        # These could be computed on demand instead of precomputed.
-        self._out_edges = collections.defaultdict(set)
-        self._in_edges = collections.defaultdict(set)
-        for edge in self._edges:
-            self._out_edges[self._tails[edge]].add(edge)
-            self._in_edges[self._heads[edge]].add(edge)
+        # The maps from vertices to their outward and inward edges, children
+        # and parents are computed on first use; see __getattr__.
         return self
 
+    def __getattr__(self, name):
+        # Only called when normal attribute lookup fails, which for the
+        # adjacency maps means that they haven't been computed yet.
+        if name == "_out_edges":
+            adjacency = self._adjacency(self._tails)
+        elif name == "_in_edges":
+            adjacency = self._adjacency(self._heads)
+        elif name == "_children":
+            adjacency = self._adjacency(self._tails, self._heads)
+        elif name == "_parents":
+            adjacency = self._adjacency(self._heads, self._tails)
+        else:
+            raise AttributeError(
+                "{!r} object has no attribute {!r}".format(type(self).__name__, name)
+            )
+        setattr(self, name, adjacency)
+        return adjacency
+
+    def __reduce__(self):
+        # Pickle only the constituents; the adjacency maps are recomputed
+        # on demand after unpickling.
+        return (
+            type(self)._raw,
+            (self._vertices, self._edges, self._heads, self._tails),
+        )
+
+    def _adjacency(self, source, target=None):
+        """
+        Map each vertex to the list of edges having that vertex as source,
+        or to the list of targets of those edges if target is given.
+
+        Each of source and target is one of self._heads and self._tails.
+
+        """
+        adjacency = collections.defaultdict(list)
+        if target is None:
+            for edge in self._edges:
+                adjacency[source[edge]].append(edge)
+        else:
+            for edge in self._edges:
+                adjacency[source[edge]].append(target[edge])
+        return adjacency
+
     @classmethod
     def from_out_edges(cls, vertices, edge_mapper):
         """
@@ -144,19 +311,17 @@ class DirectedGraph(IDirectedGraph):
         a mapping giving the vertices that each vertex is connected to.
 
         """
-        vertices = set(vertices)
-        edges = set()
-        heads = {}
-        tails = {}
+        vertices = frozenset(vertices)
+        heads = []
+        tails = []
 
-        # Number the edges arbitrarily.
-        edge_identifier = itertools.count()
+        # Number the edges consecutively, so that heads and tails can be
+        # stored as lists indexed by edge.
         for tail in vertices:
             for head in edge_mapper[tail]:
-                edge = next(edge_identifier)
-                edges.add(edge)
-                heads[edge] = head
-                tails[edge] = tail
+                heads.append(head)
+                tails.append(tail)
+        edges = range(len(heads))
 
         return cls._raw(
             vertices=vertices,
@@ -172,18 +337,14 @@ class DirectedGraph(IDirectedGraph):
         and a collection of pairs giving links between the vertices.
 
         """
-        vertices = set(vertices)
-        edges = set()
-        heads = {}
-        tails = {}
+        vertices = frozenset(vertices)
+        edge_pairs = list(edge_pairs)
 
-        # Number the edges arbitrarily.
-        edge_identifier = itertools.count()
-        for tail, head in edge_pairs:
-            edge = next(edge_identifier)
-            edges.add(edge)
-            heads[edge] = head
-            tails[edge] = tail
+        # Number the edges consecutively, in the order given, so that heads
+        # and tails can be stored as lists indexed by edge.
+        edges = range(len(edge_pairs))
+        heads = [head for _, head in edge_pairs]
+        tails = [tail for tail, _ in edge_pairs]
 
         return cls._raw(
             vertices=vertices,
@@ -198,26 +359,27 @@ class DirectedGraph(IDirectedGraph):
         as this graph.
 
         """
-        annotated_vertices = {
-            vertex: AnnotatedVertex(
-                id=vertex_id,
-                annotation=str(vertex),
-            )
-            for vertex_id, vertex in zip(itertools.count(), self.vertices)
+        vertex_ids = {
+            vertex: vertex_id for vertex_id, vertex in enumerate(self.vertices)
         }
+        annotated_vertices = [
+            AnnotatedVertex(id=vertex_id, annotation=str(vertex))
+            for vertex, vertex_id in vertex_ids.items()
+        ]
 
+        heads, tails = self._heads, self._tails
         annotated_edges = [
             AnnotatedEdge(
                 id=edge_id,
                 annotation=str(edge),
-                head=annotated_vertices[self.head(edge)].id,
-                tail=annotated_vertices[self.tail(edge)].id,
+                head=vertex_ids[heads[edge]],
+                tail=vertex_ids[tails[edge]],
             )
-            for edge_id, edge in zip(itertools.count(), self.edges)
+            for edge_id, edge in enumerate(self.edges)
         ]
 
         return AnnotatedGraph(
-            vertices=annotated_vertices.values(),
+            vertices=annotated_vertices,
             edges=annotated_edges,
         )
 
@@ -227,3 +389,10 @@ class DirectedGraph(IDirectedGraph):
 
         """
         return self.annotated().to_dot()
+
+    def write_dot(self, f):
+        """
+        Write this graph in DOT format to the given text file object.
+
+        """
+        self.annotated().write_dot(f)
@@ -38,23 +38,21 @@ class ElementTransformSet(MutableSet):
         return self._transform(element) in self._elements
 
     def __iter__(self):
-        yield from self._elements.values()
+        return iter(self._elements.values())
 
     def __len__(self):
         return len(self._elements)
 
     def add(self, element):
         """Add an element to this set."""
-        key = self._transform(element)
-        if key not in self._elements:
-            self._elements[key] = element
+        self._elements.setdefault(self._transform(element), element)
 
     def discard(self, element):
         """Remove an element.  Do not raise an exception if absent."""
-        key = self._transform(element)
-        if key in self._elements:
-            del self._elements[key]
+        self._elements.pop(self._transform(element), None)
 
     def update(self, iterable):
+        transform = self._transform
+        setdefault = self._elements.setdefault
         for element in iterable:
-            self.add(element)
+            setdefault(transform(element), element)
@@ -16,6 +16,7 @@ Abstract base class for the various flavours of directed graph.
 
 """
 import abc
+import array
 from collections import Counter, deque
 from collections.abc import Container, Iterable, Sized
 
@@ -26,6 +27,8 @@ class IDirectedGraph(Container, Iterable, Sized):
 
     """
 
+    __slots__ = ()
+
     @abc.abstractproperty
     def vertices(self):
         """
@@ -77,6 +80,9 @@ class IDirectedGraph(Container, Iterable, Sized):
         are the given ones and whose edges are all the edges
         of the original graph between those vertices.
 
+        `vertices` may be any iterable of vertices of this graph;
+        implementations should iterate over it only once.
+
         """
 
     @classmethod
@@ -123,7 +129,7 @@ class IDirectedGraph(Container, Iterable, Sized):
         Generate objects of graph.
 
         """
-        yield from self.vertices
+        return iter(self.vertices)
 
     def __contains__(self, vertex):
         """
@@ -171,17 +177,22 @@ class IDirectedGraph(Container, Iterable, Sized):
         many generations to limit to.
 
         """
+        children = self.children
         visited = self.vertex_set()
-        visited.add(start)
-        to_visit = deque([(start, 0)])
-        while to_visit:
-            vertex, depth = to_visit.popleft()
-            if depth == generations:
-                continue
-            for child in self.children(vertex):
-                if child not in visited:
-                    visited.add(child)
-                    to_visit.append((child, depth + 1))
+        visit = visited.add
+        visit(start)
+        # Breadth-first search, one generation at a time.
+        frontier = [start]
+        depth = 0
+        while frontier and depth != generations:
+            next_frontier = []
+            for vertex in frontier:
+                for child in children(vertex):
+                    if child not in visited:
+                        visit(child)
+                        next_frontier.append(child)
+            frontier = next_frontier
+            depth += 1
         return self.full_subgraph(visited)
 
     def ancestors(self, start, generations=None):
@@ -193,17 +204,22 @@ class IDirectedGraph(Container, Iterable, Sized):
         many generations to limit to.
 
         """
+        parents = self.parents
         visited = self.vertex_set()
-        visited.add(start)
-        to_visit = deque([(start, 0)])
-        while to_visit:
-            vertex, depth = to_visit.popleft()
-            if depth == generations:
-                continue
-            for parent in self.parents(vertex):
-                if parent not in visited:
-                    visited.add(parent)
-                    to_visit.append((parent, depth + 1))
+        visit = visited.add
+        visit(start)
+        # Breadth-first search, one generation at a time.
+        frontier = [start]
+        depth = 0
+        while frontier and depth != generations:
+            next_frontier = []
+            for vertex in frontier:
+                for parent in parents(vertex):
+                    if parent not in visited:
+                        visit(parent)
+                        next_frontier.append(parent)
+            frontier = next_frontier
+            depth += 1
         return self.full_subgraph(visited)
 
     def shortest_path(self, start, end):
@@ -215,6 +231,8 @@ class IDirectedGraph(Container, Iterable, Sized):
 
         Raises ValueError if no path from start to end exists.
         """
+        children, vertex_equal = self.children, self.vertex_equal
+
         # Vertices whose children are yet to be explored.
         to_visit = deque([start])
 
@@ -224,17 +242,20 @@ class IDirectedGraph(Container, Iterable, Sized):
         explored = self.vertex_dict()
         explored[start] = dummy
 
-        # Breadth-first search, rooted at ``start``.
-        while to_visit:
-            if end in explored:
-                break
-
+        # Breadth-first search, rooted at ``start``, stopping as soon as
+        # ``end`` has been reached.
+        found = self.vertex_equal(start, end)
+        while to_visit and not found:
             parent = to_visit.popleft()
-            for child in self.children(parent):
+            for child in children(parent):
                 if child not in explored:
                     explored[child] = parent
+                    if vertex_equal(child, end):
+                        found = True
+                        break
                     to_visit.append(child)
-        else:
+
+        if not found:
             raise ValueError("No path found.")
 
         # Backtrack to construct vertices of path.
@@ -255,23 +276,28 @@ class IDirectedGraph(Container, Iterable, Sized):
 
         Raises ValueError if no cycle including start exists.
         """
+        children, vertex_equal = self.children, self.vertex_equal
+
         # Vertices whose children are yet to be explored.
         to_visit = deque([start])
 
         # Mapping from each child to the parent that it was first found via.
         explored = self.vertex_dict()
 
-        # Breadth-first search, rooted at ``start``.
-        while to_visit:
-            if start in explored:
-                break
-
+        # Breadth-first search, rooted at ``start``, stopping as soon as
+        # we're back at ``start``.
+        found = False
+        while to_visit and not found:
             parent = to_visit.popleft()
-            for child in self.children(parent):
+            for child in children(parent):
                 if child not in explored:
                     explored[child] = parent
+                    if vertex_equal(child, start):
+                        found = True
+                        break
                     to_visit.append(child)
-        else:
+
+        if not found:
             raise ValueError("No path found.")
 
         # Backtrack to construct vertices of path.
@@ -285,75 +311,26 @@ class IDirectedGraph(Container, Iterable, Sized):
 
         return self.full_subgraph(path)
 
-    def _component_graph(self):
-        """
-        Compute the graph of strongly connected components.
-
-        Each strongly connected component is itself represented as a list of
-        pairs, giving information not only about the vertices belonging to
-        this strongly connected component, but also the edges leading from
-        this strongly connected component to other components.
-
-        Each pair is of the form ('EDGE', v) or ('VERTEX', v) for some vertex
-        v.  In the first case, that indicates that there's an edge from this
-        strongly connected component to the given vertex v (which will belong
-        to another component); in the second, it indicates that v is a member
-        of this strongly connected component.
-
-        Each component will begin with a vertex (the *root* vertex of the
-        strongly connected component); the following edges are edges from that
-        vertex.
-
-        Algorithm is based on that described in "Path-based depth-first search
-        for strong and biconnected components" by Harold N. Gabow,
-        Inf.Process.Lett. 74 (2000) 107--114.
-
-        """
-        sccs = []
-        stack = []
-        boundaries = []
-        identified = self.vertex_set()
-        index = self.vertex_dict()
-        to_do = []
-
-        def visit_vertex(v):
-            index[v] = len(stack)
-            stack.append(("VERTEX", v))
-            boundaries.append(index[v])
-            to_do.append((leave_vertex, v))
-            to_do.extend((visit_edge, w) for w in self.children(v))
-
-        def visit_edge(v):
-            if v in identified:
-                stack.append(("EDGE", v))
-            elif v in index:
-                while index[v] < boundaries[-1]:
-                    boundaries.pop()
-            else:
-                to_do.append((visit_vertex, v))
-
-        def leave_vertex(v):
-            if boundaries[-1] == index[v]:
-                root = boundaries.pop()
-                scc = stack[root:]
-                del stack[root:]
-                for item_type, w in scc:
-                    if item_type == "VERTEX":
-                        identified.add(w)
-                        del index[w]
-                sccs.append(scc)
-                stack.append(("EDGE", v))
-
-        # Visit every vertex of the graph.
-        for v in self.vertices:
-            if v not in identified:
-                to_do.append((visit_vertex, v))
-                while to_do:
-                    operation, v = to_do.pop()
-                    operation(v)
-                stack.pop()
-
-        return sccs
+    def _csr(self):
+        """
+        Return the structure of the graph in compressed sparse row form.
+
+        Returns a triple (vertices, offsets, targets). Here vertices is a list
+        of the vertices of the graph, and offsets and targets are arrays of
+        integers such that the children of vertices[i] are the vertices[j]
+        for j in targets[offsets[i]:offsets[i + 1]].
+
+        """
+        vertices = list(self.vertices)
+        vertex_numbers = self.vertex_dict()
+        for i, vertex in enumerate(vertices):
+            vertex_numbers[vertex] = i
+
+        def child_numbers(vertex):
+            return [vertex_numbers[child] for child in self.children(vertex)]
+
+        offsets, targets = _csr_arrays(vertices, child_numbers)
+        return vertices, offsets, targets
 
     def source_components(self):
         """
@@ -361,31 +338,16 @@ class IDirectedGraph(Container, Iterable, Sized):
         component.  Any component in the graph is reachable from one of these.
 
         """
-        raw_sccs = self._component_graph()
+        vertices, offsets, targets = self._csr()
+        component, count, entered = _strong_components(offsets, targets)
 
-        # Construct a dictionary mapping each vertex to the root of its scc.
-        vertex_to_root = self.vertex_dict()
+        # Only the vertices of the source components need collecting.
+        sccs = [None if scc_entered else [] for scc_entered in entered]
+        for vertex, c in zip(vertices, component):
+            if not entered[c]:
+                sccs[c].append(vertex)
 
-        # And keep track of which SCCs have incoming edges.
-        non_sources = self.vertex_set()
-
-        # Build maps from vertices to roots, and identify the sccs that *are*
-        # reachable from other components.
-        for scc in raw_sccs:
-            root = scc[0][1]
-            for item_type, w in scc:
-                if item_type == "VERTEX":
-                    vertex_to_root[w] = root
-                elif item_type == "EDGE":
-                    non_sources.add(vertex_to_root[w])
-
-        sccs = []
-        for raw_scc in raw_sccs:
-            root = raw_scc[0][1]
-            if root not in non_sources:
-                sccs.append([v for vtype, v in raw_scc if vtype == "VERTEX"])
-
-        return [self.full_subgraph(scc) for scc in sccs]
+        return [self.full_subgraph(scc) for scc in sccs if scc is not None]
 
     def strongly_connected_components(self):
         """
@@ -393,16 +355,15 @@ class IDirectedGraph(Container, Iterable, Sized):
 
         Returns a list of subgraphs.
 
-        Algorithm is based on that described in "Path-based depth-first search
-        for strong and biconnected components" by Harold N. Gabow,
-        Inf.Process.Lett. 74 (2000) 107--114.
+        Uses an iterative form of Tarjan's algorithm; see _strong_components.
 
         """
-        raw_sccs = self._component_graph()
+        vertices, offsets, targets = self._csr()
+        component, count, _ = _strong_components(offsets, targets)
 
-        sccs = []
-        for raw_scc in raw_sccs:
-            sccs.append([v for vtype, v in raw_scc if vtype == "VERTEX"])
+        sccs = [[] for _ in range(count)]
+        for vertex, c in zip(vertices, component):
+            sccs[c].append(vertex)
 
         return [self.full_subgraph(scc) for scc in sccs]
 
@@ -416,7 +377,7 @@ class IDirectedGraph(Container, Iterable, Sized):
 
         Returns a collections.Counter instance mapping classes to counts.
         """
-        return Counter(classifier(obj) for obj in self)
+        return Counter(map(classifier, self.vertices))
 
     def find_by(self, predicate):
         """
@@ -425,7 +386,7 @@ class IDirectedGraph(Container, Iterable, Sized):
         Here `predicate` should be a callable that accepts a single object from
         the graph and returns a value that can be interpreted as a boolean.
         """
-        return [obj for obj in self if predicate(obj)]
+        return list(filter(predicate, self.vertices))
 
     def __sub__(self, other):
         """
@@ -433,8 +394,7 @@ class IDirectedGraph(Container, Iterable, Sized):
         in self except those in other.
 
         """
-        difference = [v for v in self.vertices if v not in other.vertices]
-        return self.full_subgraph(difference)
+        return self.full_subgraph(v for v in self.vertices if v not in other.vertices)
 
     def __and__(self, other):
         """
@@ -447,5 +407,100 @@ class IDirectedGraph(Container, Iterable, Sized):
         graph, it will be.
 
         """
-        intersection = [v for v in self.vertices if v in other.vertices]
-        return self.full_subgraph(intersection)
+        return self.full_subgraph(v for v in self.vertices if v in other.vertices)
+
+
+def _csr_arrays(vertices, child_numbers):
+    """
+    Build the offsets and targets arrays of a compressed sparse row form.
+
+    child_numbers(vertex) should return the list of vertex numbers of the
+    children of the given vertex.  Returns a pair (offsets, targets) such that
+    the child numbers of vertices[i] are targets[offsets[i]:offsets[i + 1]].
+
+    """
+    offsets = array.array("q", [0])
+    targets = array.array("q")
+    for vertex in vertices:
+        targets.extend(child_numbers(vertex))
+        offsets.append(len(targets))
+    return offsets, targets
+
+
+def _strong_components(offsets, targets):
+    """
+    Find the strongly connected components of a graph in compressed sparse
+    row form.
+
+    Works purely in terms of vertex numbers: the children of vertex i are
+    targets[offsets[i]:offsets[i + 1]].  Returns a triple (component, count,
+    entered), where count is the number of strongly connected components,
+    component is a list giving, for each vertex, the number of its component,
+    and entered is a list of booleans giving, for each component, whether any
+    edge leads into it from some other component.
+
+    Components are numbered in the order in which they're completed, which is
+    a reverse topological order: any edge between two distinct components
+    leads from the higher-numbered component to the lower-numbered one.
+
+    This is Tarjan's algorithm, from "Depth-first search and linear graph
+    algorithms" by Robert Tarjan, SIAM J. Comput. 1 (1972) 146--160, with
+    vertices labelled by their stack position rather than by their order of
+    discovery.  That labelling keeps the same relative order for all
+    vertices on the stack, and lets each component be removed from the
+    stack with a single slice.
+
+    """
+    vertex_count = len(offsets) - 1
+    # For each vertex number: None if the vertex hasn't been visited yet, its
+    # (nonnegative) position on the stack while it's on the stack, and ~c
+    # (that is, -1 - c) once it's been assigned to component c.
+    index = [None] * vertex_count
+    # For each vertex on the stack, the lowest stack position reachable from
+    # it so far.
+    lowlink = [0] * vertex_count
+    entered = []
+    stack = []
+    count = 0
+
+    for start in range(vertex_count):
+        if index[start] is not None:
+            continue
+
+        index[start] = lowlink[start] = 0
+        stack.append(start)
+        to_do = [(start, iter(targets[offsets[start] : offsets[start + 1]]))]
+        while to_do:
+            v, remaining = to_do[-1]
+            for w in remaining:
+                w_index = index[w]
+                if w_index is None:
+                    index[w] = lowlink[w] = len(stack)
+                    stack.append(w)
+                    to_do.append((w, iter(targets[offsets[w] : offsets[w + 1]])))
+                    break
+                elif w_index >= 0:
+                    if w_index < lowlink[v]:
+                        lowlink[v] = w_index
+                else:
+                    # Edge into an already completed component.
+                    entered[~w_index] = True
+            else:
+                # All children of v have been examined.
+                to_do.pop()
+                root = lowlink[v]
+                if root == index[v]:
+                    for w in stack[root:]:
+                        index[w] = ~count
+                    del stack[root:]
+                    count += 1
+                    # If the search isn't finished, this component was
+                    # reached along an edge from some other component.
+                    entered.append(bool(to_do))
+                else:
+                    parent = to_do[-1][0]
+                    if root < lowlink[parent]:
+                        lowlink[parent] = root
+
+    component = [~w_index for w_index in index]
+    return component, count, entered
@@ -38,7 +38,7 @@ class KeyTransformDict(collections.abc.MutableMapping):
         self._values = {}
 
     def __iter__(self):
-        yield from self._keys.values()
+        return iter(self._keys.values())
 
     def __len__(self):
         return len(self._keys)
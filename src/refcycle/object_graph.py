@@ -16,12 +16,11 @@ Tools to analyze the Python object graph and find reference cycles.
 
 """
 import gc
-import itertools
 
 from refcycle.annotated_graph import AnnotatedEdge, AnnotatedGraph, AnnotatedVertex
 from refcycle.annotations import annotated_references, object_annotation
 from refcycle.element_transform_set import ElementTransformSet
-from refcycle.i_directed_graph import IDirectedGraph
+from refcycle.i_directed_graph import _csr_arrays, IDirectedGraph
 from refcycle.key_transform_dict import KeyTransformDict
 
 
@@ -66,6 +65,16 @@ class ObjectGraph(IDirectedGraph):
 
     """
 
+    __slots__ = (
+        "_vertices",
+        "_edges",
+        "_head",
+        "_tail",
+        "_out_edges",
+        "_in_edges",
+        "__weakref__",
+    )
+
     ###########################################################################
     # IDirectedGraph interface
     ###########################################################################
@@ -89,14 +98,42 @@ class ObjectGraph(IDirectedGraph):
         Return a list of the edges leaving this vertex.
 
         """
-        return self._out_edges[vertex]
+        return self._out_edges[id(vertex)]
 
     def in_edges(self, vertex):
         """
         Return a list of the edges entering this vertex.
 
         """
-        return self._in_edges[vertex]
+        return self._in_edges[id(vertex)]
+
+    def children(self, vertex):
+        """
+        Return the list of immediate children of the given vertex.
+
+        """
+        head = self._head
+        return [head[edge] for edge in self._out_edges[id(vertex)]]
+
+    def parents(self, vertex):
+        """
+        Return the list of immediate parents of this vertex.
+
+        """
+        tail = self._tail
+        return [tail[edge] for edge in self._in_edges[id(vertex)]]
+
+    def references(self):
+        """
+        Return (tail, head) pairs for each edge in the
+        graph.
+
+        """
+        head, tail = self._head, self._tail
+        if isinstance(self._edges, range):
+            # Built by _from_objects: head and tail are lists indexed by edge.
+            return list(zip(tail, head))
+        return [(tail[edge], head[edge]) for edge in self._edges]
 
     @property
     def vertices(self):
@@ -122,37 +159,72 @@ class ObjectGraph(IDirectedGraph):
 
         """
         vertices = ElementTransformSet(transform=id)
-        out_edges = KeyTransformDict(transform=id)
-        in_edges = KeyTransformDict(transform=id)
+        out_edges = {}
+        in_edges = {}
         for obj in objects:
             vertices.add(obj)
-            out_edges[obj] = []
-            in_edges[obj] = []
+            out_edges[id(obj)] = []
+            in_edges[id(obj)] = []
 
-        edges = set()
         head = {}
         tail = {}
 
-        for referrer in vertices:
-            for edge in self._out_edges[referrer]:
-                referent = self._head[edge]
-                if referent not in vertices:
+        graph_out_edges, graph_head, graph_tail = (
+            self._out_edges,
+            self._head,
+            self._tail,
+        )
+        for referrer_id, referrer_out_edges in out_edges.items():
+            for edge in graph_out_edges[referrer_id]:
+                referent = graph_head[edge]
+                referent_in_edges = in_edges.get(id(referent))
+                if referent_in_edges is None:
                     continue
-                edges.add(edge)
-                tail[edge] = referrer
+                tail[edge] = graph_tail[edge]
                 head[edge] = referent
-                out_edges[referrer].append(edge)
-                in_edges[referent].append(edge)
+                referrer_out_edges.append(edge)
+                referent_in_edges.append(edge)
 
         return ObjectGraph._raw(
             vertices=vertices,
-            edges=edges,
+            edges=frozenset(head),
             out_edges=out_edges,
             in_edges=in_edges,
             head=head,
             tail=tail,
         )
 
+    def _csr(self):
+        """
+        Return the structure of the graph in compressed sparse row form.
+
+        See IDirectedGraph._csr. Vertices are numbered via their ids.
+
+        """
+        vertices = list(self._vertices)
+        vertex_numbers = {id(vertex): i for i, vertex in enumerate(vertices)}
+
+        head, out_edges = self._head, self._out_edges
+
+        def child_numbers(vertex):
+            return [vertex_numbers[id(head[edge])] for edge in out_edges[id(vertex)]]
+
+        offsets, targets = _csr_arrays(vertices, child_numbers)
+        return vertices, offsets, targets
+
+    def __and__(self, other):
+        """
+        Return the intersection of the two graphs.
+
+        See IDirectedGraph.__and__.  Since vertices are compared by
+        identity, the smaller of the two vertex collections can be scanned.
+
+        """
+        if len(other) < len(self):
+            vertices = self._vertices
+            return self.full_subgraph(v for v in other.vertices if v in vertices)
+        return self.full_subgraph(v for v in self._vertices if v in other.vertices)
+
     ###########################################################################
     # Set and dict overrides
     ###########################################################################
@@ -180,7 +252,7 @@ class ObjectGraph(IDirectedGraph):
         of an ObjectGraph from its attributes.
 
         vertices is the collection of vertices
-        out_edges and in_edges map vertices to lists of edges
+        out_edges and in_edges map vertex ids to lists of edges
         head and tail map edges to objects.
 
         """
@@ -203,31 +275,31 @@ class ObjectGraph(IDirectedGraph):
 
         """
         vertices = ElementTransformSet(transform=id)
-        out_edges = KeyTransformDict(transform=id)
-        in_edges = KeyTransformDict(transform=id)
+        out_edges = {}
+        in_edges = {}
         for obj in objects:
             vertices.add(obj)
-            out_edges[obj] = []
-            in_edges[obj] = []
+            out_edges[id(obj)] = []
+            in_edges[id(obj)] = []
 
-        # Edges are identified by simple integers, so
-        # we can use plain dictionaries for mapping
+        # Edges are identified by consecutive integers, so
+        # we can use plain lists indexed by edge for mapping
         # edges to their heads and tails.
-        edge_label = itertools.count()
-        edges = set()
-        head = {}
-        tail = {}
+        head = []
+        tail = []
 
         for referrer in vertices:
+            referrer_out_edges = out_edges[id(referrer)]
             for referent in gc.get_referents(referrer):
-                if referent not in vertices:
+                referent_in_edges = in_edges.get(id(referent))
+                if referent_in_edges is None:
                     continue
-                edge = next(edge_label)
-                edges.add(edge)
-                tail[edge] = referrer
-                head[edge] = referent
-                out_edges[referrer].append(edge)
-                in_edges[referent].append(edge)
+                edge = len(head)
+                tail.append(referrer)
+                head.append(referent)
+                referrer_out_edges.append(edge)
+                referent_in_edges.append(edge)
+        edges = range(len(head))
 
         return cls._raw(
             vertices=vertices,
@@ -251,20 +323,20 @@ class ObjectGraph(IDirectedGraph):
         with the same structure.
 
         """
+        head, tail, out_edges = self._head, self._tail, self._out_edges
+
         # Build up dictionary of edge annotations.
         edge_annotations = {}
         for edge in self.edges:
             if edge not in edge_annotations:
                 # We annotate all edges from a given object at once.
-                referrer = self._tail[edge]
+                referrer = tail[edge]
                 known_refs = annotated_references(referrer)
-                for out_edge in self._out_edges[referrer]:
-                    referent = self._head[out_edge]
-                    if known_refs[referent]:
-                        annotation = known_refs[referent].pop()
-                    else:
-                        annotation = None
-                    edge_annotations[out_edge] = annotation
+                for out_edge in out_edges[id(referrer)]:
+                    descriptions = known_refs[head[out_edge]]
+                    edge_annotations[out_edge] = (
+                        descriptions.pop() if descriptions else None
+                    )
 
         annotated_vertices = [
             AnnotatedVertex(
@@ -278,8 +350,8 @@ class ObjectGraph(IDirectedGraph):
             AnnotatedEdge(
                 id=edge,
                 annotation=edge_annotations[edge],
-                head=id(self._head[edge]),
-                tail=id(self._tail[edge]),
+                head=id(head[edge]),
+                tail=id(tail[edge]),
             )
             for edge in self.edges
         ]
@@ -339,6 +411,13 @@ class ObjectGraph(IDirectedGraph):
         """
         return self.annotated().to_dot()
 
+    def write_dot(self, f):
+        """
+        Write this graph in DOT format to the given text file object.
+
+        """
+        self.annotated().write_dot(f)
+
     ###########################################################################
     # Other utility methods
     ###########################################################################
@@ -351,15 +430,10 @@ class ObjectGraph(IDirectedGraph):
         return (
             [
                 self,
-                self.__dict__,
                 self._head,
                 self._tail,
                 self._out_edges,
-                self._out_edges._keys,
-                self._out_edges._values,
                 self._in_edges,
-                self._in_edges._keys,
-                self._in_edges._values,
                 self._vertices,
                 self._vertices._elements,
                 self._edges,
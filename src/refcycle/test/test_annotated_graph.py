@@ -11,6 +11,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import io
 import os
 import shutil
 import tempfile
@@ -142,3 +143,23 @@ class TestAnnotatedGraph(unittest.TestCase):
         self.assertIsInstance(dot, str)
         self.assertIn(r'"vertex \"1\""', dot)
         self.assertIn(r'"from \"1\" to \"2\""', dot)
+
+    def test_write_dot(self):
+        graph = AnnotatedGraph(
+            vertices=[
+                AnnotatedVertex(id=0, annotation="vertex 1"),
+                AnnotatedVertex(id=1, annotation="vertex 2"),
+            ],
+            edges=[
+                AnnotatedEdge(id=3, annotation="edge", head=0, tail=1),
+            ],
+        )
+
+        f = io.StringIO()
+        graph.write_dot(f)
+        dot = f.getvalue()
+        self.assertEqual(dot, graph.to_dot())
+        self.assertTrue(dot.startswith("digraph G {\n"))
+        self.assertTrue(dot.endswith("}\n"))
+        self.assertIn('    1 -> 0 [label="edge"];\n', dot)
+        self.assertIn('    0 [label="vertex 1"];\n', dot)
@@ -322,3 +322,25 @@ class TestObjectAnnotations(unittest.TestCase):
         annotation = object_annotation(weakref)
         self.assertTrue(annotation.startswith("module\\n"))
         self.assertIn("weakref", annotation)
+
+    def test_annotate_list_subclass(self):
+        class MyList(list):
+            pass
+
+        items = MyList([1, 2, 3])
+        self.assertEqual(
+            object_annotation(items),
+            "list[3]",
+        )
+
+    def test_annotate_instance_of_unhashable_class(self):
+        class UnhashableMeta(type):
+            def __eq__(self, other):
+                return self is other
+
+        class Unhashable(metaclass=UnhashableMeta):
+            pass
+
+        annotation = object_annotation(Unhashable())
+        self.assertTrue(annotation.startswith("object\\n"))
+        self.assertIn("Unhashable", annotation)
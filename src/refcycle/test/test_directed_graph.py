@@ -15,7 +15,11 @@
 Tests for the DirectedGraph class.
 
 """
+import copy
+import io
+import pickle
 import unittest
+import weakref
 
 from refcycle.directed_graph import DirectedGraph
 
@@ -146,6 +150,18 @@ class TestDirectedGraph(unittest.TestCase):
         sccs = graph.strongly_connected_components()
         self.assertEqual(len(sccs), 1)
 
+    def test_strongly_connected_components_many_components(self):
+        # Building the subgraph for each component should only involve the
+        # edges leaving that component, not every edge of the graph.
+        vertex_count = 20000
+        vertices = set(range(vertex_count))
+        edge_mapper = {n: [n + 1, n + 1] for n in range(vertex_count - 1)}
+        edge_mapper[vertex_count - 1] = []
+        graph = DirectedGraph.from_out_edges(vertices, edge_mapper)
+        sccs = graph.strongly_connected_components()
+        self.assertEqual(len(sccs), vertex_count)
+        self.assertTrue(all(len(scc.edges) == 0 for scc in sccs))
+
     def test_limited_descendants(self):
         graph = graph_from_string(
             "1 2 3 4 5 6; 1->2 1->3 2->3 2->4 4->3 4->5 5->2 5->6 6->3 6->4"
@@ -212,6 +228,17 @@ class TestDirectedGraph(unittest.TestCase):
         descendants = graph.descendants(0)
         self.assertEqual(set(descendants), vertices)
 
+    def test_descendants_and_ancestors_deep(self):
+        # A deep graph will blow Python's recursion limit with
+        # a recursive traversal.
+        depth = 10000
+        vertices = set(range(depth + 1))
+        edge_mapper = {i: [i + 1] for i in range(depth)}
+        edge_mapper[depth] = []
+        graph = DirectedGraph.from_out_edges(vertices, edge_mapper)
+        self.assertEqual(len(graph.descendants(0)), depth + 1)
+        self.assertEqual(len(graph.ancestors(depth)), depth + 1)
+
     def test_limited_ancestors(self):
         graph = graph_from_string(
             "1 2 3 4 5 6; 1->2 1->3 2->3 2->4 4->3 4->5 5->2 5->6 6->3 6->4"
@@ -287,6 +314,47 @@ class TestDirectedGraph(unittest.TestCase):
         self.assertCountEqual(vertices, [1, 2, 3, 4, 5])
         self.assertEqual(len(edges), 5)
 
+    def test_subgraph_edge_containment(self):
+        graph = DirectedGraph.from_edge_pairs([1, 2, 3], [(1, 2), (2, 3), (3, 1)])
+        edge_12, edge_23, edge_31 = graph.edges
+        subgraphs = [
+            graph.full_subgraph([1, 2]),
+            graph.descendants(1, generations=1),
+            graph.ancestors(2, generations=1),
+        ]
+        for subgraph in subgraphs:
+            self.assertIn(edge_12, subgraph.edges)
+            self.assertNotIn(edge_23, subgraph.edges)
+            self.assertNotIn(edge_31, subgraph.edges)
+
+    def test_pickle_and_deepcopy_subgraphs(self):
+        subgraphs = [
+            test_graph.full_subgraph(range(1, 6)),
+            test_graph.descendants(1, generations=1),
+            test_graph.strongly_connected_components()[0],
+        ]
+        for subgraph in subgraphs:
+            for copied in [
+                pickle.loads(pickle.dumps(subgraph)),
+                copy.deepcopy(subgraph),
+            ]:
+                self.assertCountEqual(copied.vertices, subgraph.vertices)
+                self.assertCountEqual(copied.edges, subgraph.edges)
+                self.assertCountEqual(copied.references(), subgraph.references())
+
+    def test_pickle_all_protocols(self):
+        graph = DirectedGraph.from_edge_pairs([1, 2, 3], [(1, 2), (2, 3)])
+        # Force computation of the adjacency maps; they shouldn't be pickled.
+        graph.children(1)
+        graph.parents(1)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            pickled = pickle.dumps(graph, protocol)
+            self.assertNotIn(b"defaultdict", pickled)
+            copied = pickle.loads(pickled)
+            self.assertCountEqual(copied.vertices, graph.vertices)
+            self.assertCountEqual(copied.references(), graph.references())
+            self.assertCountEqual(copied.children(1), [2])
+
     def test_full_subgraph_large_from_list(self):
         # An earlier version of full_subgraph had quadratic-time behaviour.
         vertex_count = 20000
@@ -317,6 +385,30 @@ class TestDirectedGraph(unittest.TestCase):
         self.assertEqual(len(subgraph.vertices), len(graph.vertices))
         self.assertEqual(len(subgraph.edges), len(graph.edges))
 
+    def test_intersection_keeps_own_vertices(self):
+        # The intersection is a subgraph of the left operand, even when
+        # the right operand is smaller and only has equal vertices.
+        graph1 = DirectedGraph.from_edge_pairs([1, 2, 3, 4], [(1, 2)])
+        graph2 = DirectedGraph.from_edge_pairs([1.0, 2.0], [])
+        intersection = graph1 & graph2
+        self.assertCountEqual(
+            [type(vertex) for vertex in intersection.vertices], [int, int]
+        )
+        self.assertEqual(intersection.references(), [(1, 2)])
+        [(tail, head)] = intersection.references()
+        self.assertIs(type(tail), int)
+        self.assertIs(type(head), int)
+
+    def test_weakref(self):
+        graph = DirectedGraph.from_edge_pairs([1, 2], [(1, 2)])
+        ref = weakref.ref(graph)
+        self.assertIs(ref(), graph)
+
     def test_to_dot(self):
         dot = test_graph.to_dot()
         self.assertIsInstance(dot, str)
+
+    def test_write_dot(self):
+        f = io.StringIO()
+        test_graph.write_dot(f)
+        self.assertEqual(f.getvalue(), test_graph.to_dot())
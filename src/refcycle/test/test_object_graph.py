@@ -13,12 +13,14 @@
 # limitations under the License.
 import collections.abc
 import gc
+import io
 import json
 import os
 import shutil
 import subprocess
 import tempfile
 import unittest
+import weakref
 import xml.etree.ElementTree as ET
 
 from refcycle.creators import objects_reachable_from
@@ -225,6 +227,19 @@ class TestObjectGraph(unittest.TestCase):
         self.assertCountEqual(graph.ancestors(c), [c, a])
         self.assertCountEqual(graph.ancestors(d), [d, b, c, a])
 
+    def test_subgraph_edge_containment(self):
+        a = []
+        b = []
+        c = []
+        a.append(b)
+        b.append(c)
+        graph = ObjectGraph([a, b, c])
+        [edge_ab] = graph.out_edges(a)
+        [edge_bc] = graph.out_edges(b)
+        subgraph = graph.full_subgraph([a, b])
+        self.assertIn(edge_ab, subgraph.edges)
+        self.assertNotIn(edge_bc, subgraph.edges)
+
     def test_shortest_path(self):
         # Looking for paths from a to f, we have:
         #     a -> b -> e -> f
@@ -366,6 +381,20 @@ class TestObjectGraph(unittest.TestCase):
         )
         self.assertIsInstance(dot, str)
 
+    def test_write_dot(self):
+        a = []
+        b = []
+        a.append(b)
+        graph = ObjectGraph([a, b])
+        f = io.StringIO()
+        graph.write_dot(f)
+        dot = f.getvalue()
+        self.assertEqual(dot, graph.to_dot())
+        self.assertIn(
+            '{} -> {} [label="item[0]"];'.format(id(a), id(b)),
+            dot,
+        )
+
     def test_to_json(self):
         # XXX Needs a better test.  For now, just exercise the
         # to_json method.
@@ -417,6 +446,11 @@ class TestObjectGraph(unittest.TestCase):
         sccs = refgraph.strongly_connected_components()
         self.assertEqual(len(sccs), len(objects))
 
+    def test_weakref(self):
+        graph = ObjectGraph([])
+        ref = weakref.ref(graph)
+        self.assertIs(ref(), graph)
+
     def test_intersection(self):
         a = []
         b = []
@@ -435,6 +469,25 @@ class TestObjectGraph(unittest.TestCase):
         self.assertNotIn(a, intersection)
         self.assertNotIn(b, intersection)
 
+    def test_intersection_with_smaller_graph(self):
+        a = []
+        b = []
+        c = []
+        d = []
+        c.append(d)
+        a.append(c)
+        b.append(c)
+        graph1 = ObjectGraph([a, c, d])
+        graph2 = ObjectGraph([b, c])
+        intersection = graph1 & graph2
+        self.assertEqual(len(intersection), 1)
+        self.assertIn(c, intersection)
+        self.assertEqual(len(intersection.edges), 0)
+
+        intersection = graph1 & graph1.descendants(c)
+        self.assertEqual(len(intersection), 2)
+        self.assertEqual(intersection.references(), [(c, d)])
+
     def test_subtraction(self):
         a = []
         b = []